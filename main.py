@@ -39,7 +39,7 @@ def main():
         app.run()
 
     except Exception as e:
-        logger.error(f"Error fatal en la aplicación: {e}", exc_info=True)
+        logger.error("Error fatal en la aplicación: %s", e, exc_info=True)
         sys.exit(1)
 
 
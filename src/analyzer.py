@@ -2,20 +2,88 @@
 Módulo principal de análisis de artículos científicos con OpenAI.
 """
 
-from openai import OpenAI
-from typing import Dict, List, Tuple, Callable, Optional
+from openai import OpenAI, AsyncOpenAI
+from typing import Any, Dict, List, Literal, Tuple, Callable, Optional
+import asyncio
+import functools
+import io
+import json
 import logging
+import time
 from dataclasses import dataclass
 
+import tiktoken
+
+from .utils.rate_limiter import ModelRateLimiter
+from .utils.response_cache import ResponseCache
+
 logger = logging.getLogger(__name__)
 
+# Modelo de embeddings usado por la caché semántica
+EMBEDDING_MODEL = "text-embedding-3-small"
+# Caracteres del artículo usados para calcular el embedding (límite de ~8k tokens)
+EMBEDDING_MAX_CHARS = 20000
+
+# Páginas iniciales (resumen e introducción) usadas por los pasos con alcance "head"
+HEAD_PAGES = 2
+# Caracteres máximos del inicio del artículo, se tome o no de las páginas
+HEAD_MAX_CHARS = 15000
+# Paso cuyo resultado sirve de contexto a los pasos con alcance "summary"
+SUMMARY_STEP = "resumen_articulo"
+# Nombre del paso interno que condensa los artículos que no caben en el contexto
+CONDENSE_STEP = "condensar"
+# Modelo ligero para los pasos que no requieren razonamiento complejo
+LIGHT_MODEL = "gpt-4o-mini"
+
+# Margen de tokens reservado para el formato de los mensajes de chat
+TOKEN_MARGIN = 512
+# Caracteres por token usados para estimar cuando no se dispone de tiktoken
+CHARS_PER_TOKEN = 4
+# Instrucción usada para condensar fragmentos de artículos que no caben en el contexto
+CONDENSE_PROMPT = (
+    "Resume de forma exhaustiva este fragmento de un artículo científico, "
+    "conservando objetivos, métodos, resultados, cifras y conclusiones."
+)
+
+# Instrucciones fijas que preceden al texto del artículo en el mensaje de sistema
+SYSTEM_PREAMBLE = (
+    "Eres un experto en análisis de artículos científicos. Responde a la "
+    "consulta del usuario basándote en el siguiente texto.\n\n"
+)
+
 
 @dataclass
 class AnalysisStep:
-    """Representa un paso del análisis."""
+    """
+    Representa un paso del análisis.
+
+    `scope` indica qué parte del artículo recibe el modelo: el texto completo
+    ("full"), sólo las primeras páginas ("head") o el resultado del paso de
+    resumen ("summary"). `model` permite usar un modelo distinto del
+    configurado en el analizador.
+    """
     name: str
     description: str
     prompt: str
+    scope: Literal["full", "head", "summary"] = "full"
+    model: Optional[str] = None
+
+
+class _ApproxEncoding:
+    """
+    Sustituto aproximado de una codificación de tiktoken.
+
+    tiktoken descarga su vocabulario la primera vez que se usa; sin acceso a
+    esa descarga se cuenta un "token" por cada `CHARS_PER_TOKEN` caracteres.
+    """
+
+    def encode(self, texto: str) -> List[str]:
+        """Divide el texto en trozos de `CHARS_PER_TOKEN` caracteres."""
+        return [texto[i:i + CHARS_PER_TOKEN] for i in range(0, len(texto), CHARS_PER_TOKEN)]
+
+    def decode(self, tokens: List[str]) -> str:
+        """Vuelve a unir los trozos."""
+        return "".join(tokens)
 
 
 class ArticleAnalyzer:
@@ -26,7 +94,8 @@ class ArticleAnalyzer:
         AnalysisStep(
             name="resumen_articulo",
             description="Resumen del Artículo",
-            prompt="Elabora un resumen detallado del artículo científico, destacando los puntos más importantes."
+            prompt="Elabora un resumen detallado del artículo científico, destacando los puntos más importantes.",
+            model=LIGHT_MODEL
         ),
         AnalysisStep(
             name="base_teorica",
@@ -41,22 +110,28 @@ class ArticleAnalyzer:
         AnalysisStep(
             name="conceptos_clave",
             description="Conceptos Clave",
-            prompt="¿Cuáles son los conceptos clave que aborda el artículo? Enumera y explica brevemente cada uno."
+            prompt="¿Cuáles son los conceptos clave que aborda el artículo? Enumera y explica brevemente cada uno.",
+            scope="head",
+            model=LIGHT_MODEL
         ),
         AnalysisStep(
             name="objetivos",
             description="Objetivos de Investigación",
-            prompt="¿Cuáles son los objetivos principales de la investigación presentada en el artículo?"
+            prompt="¿Cuáles son los objetivos principales de la investigación presentada en el artículo?",
+            scope="head",
+            model=LIGHT_MODEL
         ),
         AnalysisStep(
             name="resultados",
             description="Resultados Principales",
-            prompt="¿Cuáles son los principales resultados y hallazgos presentados en el artículo?"
+            prompt="¿Cuáles son los principales resultados y hallazgos presentados en el artículo?",
+            model=LIGHT_MODEL
         ),
         AnalysisStep(
             name="evaluacion_critica",
             description="Evaluación Crítica",
-            prompt="Realiza una evaluación crítica de los métodos y resultados presentados. ¿Cuáles son las fortalezas y debilidades?"
+            prompt="Realiza una evaluación crítica de los métodos y resultados presentados. ¿Cuáles son las fortalezas y debilidades?",
+            scope="summary"
         ),
         AnalysisStep(
             name="contexto_literatura",
@@ -66,16 +141,27 @@ class ArticleAnalyzer:
         AnalysisStep(
             name="implicaciones",
             description="Implicaciones y Futuras Direcciones",
-            prompt="¿Cuáles son las implicaciones de estos hallazgos y qué futuras líneas de investigación sugiere el artículo?"
+            prompt="¿Cuáles son las implicaciones de estos hallazgos y qué futuras líneas de investigación sugiere el artículo?",
+            scope="summary"
         ),
         AnalysisStep(
             name="conclusiones",
             description="Conclusiones",
-            prompt="Resume las conclusiones principales del artículo y su relevancia científica."
+            prompt="Resume las conclusiones principales del artículo y su relevancia científica.",
+            scope="summary",
+            model=LIGHT_MODEL
         )
     ]
 
-    def __init__(self, api_key: str, model: str = "gpt-4o-2024-08-06", max_tokens: int = 1024):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gpt-4o-2024-08-06",
+        max_tokens: int = 1024,
+        cache: Optional[ResponseCache] = None,
+        context_tokens: int = 128000,
+        limiter: Optional[ModelRateLimiter] = None
+    ):
         """
         Inicializa el analizador.
 
@@ -83,85 +169,764 @@ class ArticleAnalyzer:
             api_key (str): API key de OpenAI.
             model (str): Modelo de OpenAI a utilizar.
             max_tokens (int): Máximo de tokens por respuesta.
+            cache (Optional[ResponseCache]): Caché de respuestas entre ejecuciones.
+            context_tokens (int): Tamaño de la ventana de contexto del modelo.
+            limiter (Optional[ModelRateLimiter]): Limitadores de peticiones y
+                tokens por minuto, por modelo, para las llamadas concurrentes.
         """
         self.client = OpenAI(api_key=api_key)
+        self.aclient = AsyncOpenAI(api_key=api_key)
         self.model = model
         self.max_tokens = max_tokens
-        logger.info(f"ArticleAnalyzer inicializado con modelo: {model}")
+        # Parámetros comunes a todas las peticiones de chat
+        self._base_kwargs = {"model": model, "max_tokens": max_tokens}
+        self.cache = cache
+        self.context_tokens = context_tokens
+        self.limiter = limiter
+
+        # Tokenizar una sola vez los prompts fijos de cada paso. El conteo de
+        # tokens sólo sirve para ajustar el contexto: si tiktoken no puede
+        # descargar su vocabulario, se estima en lugar de fallar
+        try:
+            try:
+                self._encoding = tiktoken.encoding_for_model(model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+        except Exception as e:
+            logger.warning("No se pudo cargar el tokenizador (%s): se estimarán los tokens", e)
+            self._encoding = _ApproxEncoding()
+        self._prompt_token_counts = {
+            step.name: len(self._encoding.encode(SYSTEM_PREAMBLE + step.prompt))
+            for step in self.ANALYSIS_STEPS
+        }
+        # Conteos de tokens de los textos enviados en el análisis en curso
+        self._token_counts: Dict[str, int] = {}
+        # Embeddings de artículos nuevos, pendientes de registrar en la caché
+        # semántica hasta que se guarde alguna de sus respuestas
+        self._pending_embeddings: Dict[str, List[float]] = {}
+        # Bucle de eventos propio: el pool de conexiones de AsyncOpenAI queda
+        # ligado al bucle en que se creó, así que se reutiliza entre análisis
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        logger.info("ArticleAnalyzer inicializado con modelo: %s", model)
 
     def analyze_article(
         self,
         texto_completo: str,
-        progress_callback: Optional[Callable[[str, str, int, int], None]] = None
+        progress_callback: Optional[Callable[[str, str, int, int], None]] = None,
+        concurrency: int = 8,
+        chunks: Optional[List[str]] = None,
+        token_callback: Optional[Callable[[str, str], None]] = None
     ) -> Dict[str, str]:
         """
         Analiza un artículo científico siguiendo múltiples pasos.
 
+        Envoltorio síncrono de `analyze_article_async`.
+
         Args:
             texto_completo (str): Texto del artículo a analizar.
             progress_callback (Optional[Callable]): Función callback para reportar progreso.
                 Recibe (step_name, step_description, current_step, total_steps).
+            concurrency (int): Máximo de llamadas simultáneas a la API.
+            chunks (Optional[List[str]]): Texto del artículo por páginas.
+            token_callback (Optional[Callable]): Función que recibe
+                (step_name, fragmento) a medida que llega cada respuesta.
+
+        Returns:
+            Dict[str, str]: Diccionario con los resultados de cada paso del análisis.
+        """
+        return self._run(
+            self.analyze_article_async(
+                texto_completo, progress_callback, concurrency, chunks, token_callback
+            )
+        )
+
+    def _run(self, coro):
+        """
+        Ejecuta una corrutina en el bucle de eventos del analizador.
+
+        Args:
+            coro: Corrutina a ejecutar.
+
+        Returns:
+            El resultado de la corrutina.
+        """
+        if self._loop is None or self._loop.is_closed():
+            self._loop = asyncio.new_event_loop()
+        return self._loop.run_until_complete(coro)
+
+    async def analyze_article_async(
+        self,
+        texto_completo: str,
+        progress_callback: Optional[Callable[[str, str, int, int], None]] = None,
+        concurrency: int = 8,
+        chunks: Optional[List[str]] = None,
+        token_callback: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, str]:
+        """
+        Analiza un artículo ejecutando todos los pasos de forma concurrente.
+
+        Los pasos se lanzan a la vez y un semáforo limita las llamadas
+        simultáneas a la API. Los pasos con alcance "summary" esperan al paso
+        de resumen y reciben su resultado en lugar del texto completo.
+
+        Args:
+            texto_completo (str): Texto del artículo a analizar.
+            progress_callback (Optional[Callable]): Función callback para reportar progreso.
+                Se invoca al completarse cada paso con
+                (step_name, step_description, completed_steps, total_steps).
+            concurrency (int): Máximo de llamadas simultáneas a la API.
+            chunks (Optional[List[str]]): Texto del artículo por páginas, usado
+                para los pasos con alcance "head".
+            token_callback (Optional[Callable]): Función que recibe
+                (step_name, fragmento) a medida que llega cada respuesta. Las
+                respuestas en caché se entregan en un único fragmento.
 
         Returns:
             Dict[str, str]: Diccionario con los resultados de cada paso del análisis.
         """
         logger.info("Iniciando análisis del artículo científico")
 
-        if not texto_completo or not texto_completo.strip():
+        if not texto_completo or texto_completo.isspace():
             raise ValueError("El texto del artículo está vacío")
 
-        resultados = {}
+        # El analizador se reutiliza en toda la sesión: descartar los conteos
+        # (y los textos que los indexan) de análisis anteriores
+        self._token_counts.clear()
+
         total_steps = len(self.ANALYSIS_STEPS)
+        sem = asyncio.Semaphore(max(1, concurrency))
+        completados = 0
+
+        hashes = []
+        if self.cache:
+            # run_in_executor en lugar de asyncio.to_thread (Python 3.9+)
+            hashes = await asyncio.get_running_loop().run_in_executor(
+                None, self._resolve_cache_hashes, texto_completo
+            )
 
-        for idx, step in enumerate(self.ANALYSIS_STEPS, start=1):
-            logger.info(f"Paso {idx}/{total_steps}: {step.description}")
+        # Consultar la caché antes de nada (las claves usan el texto original):
+        # el texto sólo se condensa si algún paso que lo necesita no tiene
+        # respuesta guardada
+        head = self._head_text(texto_completo, chunks)
+        cacheados = {step.name: self._get_cached(hashes, step) for step in self.ANALYSIS_STEPS}
+        tareas: Dict[str, asyncio.Task] = {}
+        ajuste: Optional[asyncio.Task] = None
 
-            # Llamar al callback de progreso si existe
-            if progress_callback:
-                progress_callback(step.name, step.description, idx, total_steps)
+        def texto_ajustado() -> asyncio.Task:
+            nonlocal ajuste
+            if ajuste is None:
+                ajuste = asyncio.ensure_future(self._fit_context_async(
+                    texto_completo, sem, hashes[0] if hashes else None
+                ))
+            return ajuste
 
+        async def run_step(step: AnalysisStep) -> str:
+            nonlocal completados
+            on_token = functools.partial(token_callback, step.name) if token_callback else None
             try:
-                # Realizar el análisis para este paso
-                resultado = self._analyze_step(texto_completo, step)
-                resultados[step.name] = resultado
+                resultado = cacheados[step.name]
+                if resultado is not None and on_token:
+                    on_token(resultado)
+                if resultado is None:
+                    resumen = None
+                    if step.scope == "summary" and SUMMARY_STEP in tareas:
+                        try:
+                            resumen = await tareas[SUMMARY_STEP]
+                        except Exception:
+                            resumen = None
+
+                    texto = texto_completo
+                    if self._needs_full_text(step, resumen):
+                        texto = await texto_ajustado()
+                    contexto = self._step_context(step, texto, head, resumen)
+                    resultado = await self._analyze_step_async(contexto, step, sem, on_token)
+                    self._put_cached(hashes, step, resultado)
+                return resultado
+            finally:
+                completados += 1
+                logger.info("Paso %d/%d: %s", completados, total_steps, step.description)
+
+                # Llamar al callback de progreso si existe
+                if progress_callback:
+                    progress_callback(step.name, step.description, completados, total_steps)
+
+        for step in self.ANALYSIS_STEPS:
+            tareas[step.name] = asyncio.ensure_future(run_step(step))
+
+        respuestas = await asyncio.gather(*tareas.values(), return_exceptions=True)
+
+        resultados = {}
+        for step, respuesta in zip(self.ANALYSIS_STEPS, respuestas):
+            if isinstance(respuesta, Exception):
+                logger.error("Error en paso %s: %s", step.name, respuesta)
+                resultados[step.name] = f"Error: {str(respuesta)}"
+            else:
+                resultados[step.name] = respuesta
+                logger.debug("Completado: %s", step.name)
+
+        logger.info("Análisis completado")
+        return resultados
+
+    async def _analyze_step_async(
+        self,
+        texto: str,
+        step: AnalysisStep,
+        sem: asyncio.Semaphore,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """
+        Ejecuta un paso individual del análisis de forma asíncrona.
+
+        Args:
+            texto (str): Texto del artículo.
+            step (AnalysisStep): Paso de análisis a ejecutar.
+            sem (asyncio.Semaphore): Semáforo que limita las llamadas concurrentes.
+            on_token (Optional[Callable]): Función que recibe cada fragmento de
+                la respuesta según llega.
+
+        Returns:
+            str: Resultado del análisis.
+        """
+        async with sem:
+            try:
+                kwargs = self._request_kwargs(texto, step)
+
+                if self.limiter:
+                    prompt_tokens = self._prompt_token_counts.get(step.name)
+                    if prompt_tokens is None:
+                        prompt_tokens = len(self._encoding.encode(SYSTEM_PREAMBLE + step.prompt))
+                    expected = prompt_tokens + self._count_tokens(texto) + self.max_tokens
+                    limiter = self.limiter.get(kwargs["model"])
+                    await limiter.acquire(expected_tokens=expected)
+                    try:
+                        raw = await self.aclient.chat.completions.with_raw_response.create(**kwargs)
+                    finally:
+                        limiter.release(expected_tokens=expected)
+                    limiter.update_from_headers(raw.headers)
+                    response = raw.parse()
+                else:
+                    response = await self.aclient.chat.completions.create(**kwargs)
+
+                partes = []
+                async for chunk in response:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content or ""
+                    if delta:
+                        partes.append(delta)
+                        if on_token:
+                            on_token(delta)
 
-                logger.debug(f"Completado: {step.name}")
+                return "".join(partes).strip() or "Error: No se obtuvo respuesta del modelo"
 
             except Exception as e:
-                logger.error(f"Error en paso {step.name}: {e}")
-                resultados[step.name] = f"Error: {str(e)}"
+                logger.error("Error en llamada a OpenAI: %s", e)
+                raise
+
+    def _count_tokens(self, texto: str) -> int:
+        """Cuenta los tokens de un texto, reutilizando conteos del análisis en curso."""
+        n = self._token_counts.get(texto)
+        if n is None:
+            n = len(self._encoding.encode(texto))
+            self._token_counts[texto] = n
+        return n
+
+    def _text_budget(self) -> int:
+        """Tokens disponibles para el artículo en una petición de cualquier paso."""
+        return max(1, (
+            self.context_tokens
+            - self.max_tokens
+            - max(self._prompt_token_counts.values())
+            - TOKEN_MARGIN
+        ))
+
+    async def _fit_context_async(
+        self,
+        texto: str,
+        sem: Optional[asyncio.Semaphore] = None,
+        text_hash: Optional[str] = None
+    ) -> str:
+        """
+        Ajusta el texto del artículo a la ventana de contexto del modelo.
+
+        El texto se tokeniza una sola vez. Si excede el presupuesto, se divide
+        en fragmentos que se resumen de forma concurrente (map) y se unen los
+        resúmenes (reduce), repitiendo mientras siga sin caber.
+
+        Args:
+            texto (str): Texto del artículo.
+            sem (Optional[asyncio.Semaphore]): Semáforo que limita las
+                llamadas concurrentes. Si no se indica, se crea uno aquí, ya
+                dentro del bucle de eventos en ejecución.
+            text_hash (Optional[str]): Hash del texto original; si hay caché,
+                el texto condensado se guarda y reutiliza bajo este hash.
+
+        Returns:
+            str: Texto original si cabe, o su versión condensada.
+        """
+        if sem is None:
+            sem = asyncio.Semaphore(8)
+
+        budget = self._text_budget()
+        tokens = self._encoding.encode(texto)
+        if len(tokens) <= budget:
+            self._token_counts[texto] = len(tokens)
+            return texto
+
+        # El resultado depende del presupuesto, que forma parte de la clave
+        clave = None
+        if self.cache and text_hash:
+            clave = self.cache.make_key(LIGHT_MODEL, f"{CONDENSE_STEP}:{budget}", text_hash)
+            condensado = self.cache.get(clave)
+            if condensado is not None:
+                logger.info("Texto condensado recuperado de caché")
+                return condensado
+
+        while len(tokens) > budget:
+            logger.info(
+                "El artículo excede el contexto (%d tokens > %d): condensando",
+                len(tokens), budget
+            )
+            fragmentos = [
+                self._encoding.decode(tokens[i:i + budget])
+                for i in range(0, len(tokens), budget)
+            ]
+            step = AnalysisStep(
+                name=CONDENSE_STEP,
+                description="Condensación del artículo",
+                prompt=CONDENSE_PROMPT,
+                model=LIGHT_MODEL
+            )
+            resumenes = await asyncio.gather(
+                *(self._analyze_step_async(f, step, sem) for f in fragmentos)
+            )
+            texto = "\n\n".join(resumenes)
+            tokens = self._encoding.encode(texto)
+
+        self._token_counts[texto] = len(tokens)
+        if clave and not any(r.startswith("Error:") for r in resumenes):
+            self.cache.set(clave, texto)
+        return texto
+
+    def analyze_article_batched(
+        self,
+        texto_completo: str,
+        progress_callback: Optional[Callable[[str, str, int, int], None]] = None,
+        poll_interval: float = 30.0,
+        chunks: Optional[List[str]] = None
+    ) -> Dict[str, str]:
+        """
+        Analiza un artículo enviando todos los pasos como un único trabajo de la Batch API.
+
+        La Batch API cobra la mitad por token a cambio de procesar el trabajo de
+        forma diferida (ventana de hasta 24 h), por lo que sólo es adecuada para
+        flujos no interactivos. Como todas las peticiones viajan en el mismo
+        trabajo, los pasos con alcance "summary" reciben el texto completo, y
+        todas usan el modelo del analizador (la Batch API admite un único
+        modelo por trabajo).
+
+        Args:
+            texto_completo (str): Texto del artículo a analizar.
+            progress_callback (Optional[Callable]): Función callback para reportar progreso.
+                Recibe (step_name, step_description, completed_requests, total_requests)
+                en cada sondeo del estado del trabajo; sólo cuentan las peticiones
+                enviadas, no los pasos servidos desde la caché.
+            poll_interval (float): Segundos entre consultas del estado del trabajo.
+            chunks (Optional[List[str]]): Texto del artículo por páginas.
+
+        Returns:
+            Dict[str, str]: Diccionario con los resultados de cada paso del análisis.
+
+        Raises:
+            RuntimeError: Si el trabajo termina sin completarse.
+        """
+        logger.info("Iniciando análisis del artículo científico (Batch API)")
+
+        if not texto_completo or texto_completo.isspace():
+            raise ValueError("El texto del artículo está vacío")
+
+        self._token_counts.clear()
+        resultados = {}
+
+        hashes = self._resolve_cache_hashes(texto_completo) if self.cache else []
+        pendientes = []
+        for step in self.ANALYSIS_STEPS:
+            resultado = self._get_cached(hashes, step, self.model)
+            if resultado is None:
+                pendientes.append(step)
+            else:
+                resultados[step.name] = resultado
+
+        if not pendientes:
+            logger.info("Análisis completado (todas las respuestas en caché)")
+            return resultados
+
+        # Construir el fichero JSONL en memoria, una petición por paso; el
+        # texto sólo se condensa si algún paso pendiente lo necesita
+        head = self._head_text(texto_completo, chunks)
+        if any(self._needs_full_text(step, None) for step in pendientes):
+            texto_completo = self._run(
+                self._fit_context_async(
+                    texto_completo, text_hash=hashes[0] if hashes else None
+                )
+            )
+        buf = io.BytesIO()
+        for step in pendientes:
+            contexto = self._step_context(step, texto_completo, head, None)
+            peticion = {
+                "custom_id": step.name,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    **self._base_kwargs,
+                    "messages": self._build_messages(contexto, step)
+                }
+            }
+            buf.write(json.dumps(peticion, ensure_ascii=False).encode("utf-8"))
+            buf.write(b"\n")
+        buf.seek(0)
+
+        input_file = self.client.files.create(
+            file=("analisis.jsonl", buf),
+            purpose="batch"
+        )
+        # El fichero de entrada contiene el artículo completo: no se deja en
+        # el almacenamiento de la cuenta, tampoco si el trabajo falla
+        batch = None
+        try:
+            batch = self.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+            logger.info("Trabajo batch creado: %s", batch.id)
+
+            # Esperar a que el trabajo termine
+            while batch.status not in ("completed", "failed", "expired", "cancelled"):
+                time.sleep(poll_interval)
+                batch = self.client.batches.retrieve(batch.id)
+                logger.debug("Estado del trabajo batch %s: %s", batch.id, batch.status)
+
+                if progress_callback and batch.request_counts:
+                    progress_callback(
+                        "batch",
+                        f"Trabajo batch: {batch.status}",
+                        batch.request_counts.completed,
+                        len(pendientes)
+                    )
+
+            if batch.status != "completed":
+                raise RuntimeError(f"El trabajo batch terminó con estado: {batch.status}")
+
+            steps_por_nombre = {step.name: step for step in pendientes}
+            if batch.output_file_id:
+                contenido = self.client.files.content(batch.output_file_id).text
+                for linea in contenido.splitlines():
+                    if not linea or linea.isspace():
+                        continue
+                    registro = json.loads(linea)
+                    step_name = registro["custom_id"]
+                    try:
+                        body = registro["response"]["body"]
+                        # content puede ser null (p. ej. respuesta rechazada)
+                        contenido_msg = body["choices"][0]["message"]["content"] or ""
+                        resultados[step_name] = (
+                            contenido_msg.strip() or "Error: No se obtuvo respuesta del modelo"
+                        )
+                        self._put_cached(
+                            hashes, steps_por_nombre[step_name], resultados[step_name], self.model
+                        )
+                        logger.debug("Completado: %s", step_name)
+                    except (KeyError, IndexError, TypeError):
+                        error = self._batch_error(registro)
+                        logger.error("Error en paso %s: %s", step_name, error)
+                        resultados[step_name] = f"Error: {error}"
+        finally:
+            file_ids = [input_file.id]
+            if batch is not None:
+                file_ids += [batch.output_file_id, batch.error_file_id]
+            self._delete_files(file_ids)
+
+        # Los pasos sin línea de salida fallaron y figuran en el fichero de errores
+        for step in self.ANALYSIS_STEPS:
+            if step.name not in resultados:
+                logger.error("Error en paso %s: sin respuesta en el trabajo batch", step.name)
+                resultados[step.name] = "Error: No se obtuvo respuesta del modelo"
 
         logger.info("Análisis completado")
         return resultados
 
-    def _analyze_step(self, texto: str, step: AnalysisStep) -> str:
+    @staticmethod
+    def _batch_error(registro: dict) -> str:
+        """
+        Obtiene el mensaje de error de una línea de salida de la Batch API.
+
+        Args:
+            registro (dict): Línea de salida ya decodificada.
+
+        Returns:
+            str: Mensaje del error de la línea o, si no lo hay, del cuerpo de
+                la respuesta (peticiones con estado distinto de 200).
+        """
+        error = registro.get("error")
+        if not error:
+            body = (registro.get("response") or {}).get("body")
+            if isinstance(body, dict):
+                error = body.get("error")
+        if isinstance(error, dict):
+            error = error.get("message")
+        return error or "No se obtuvo respuesta del modelo"
+
+    def _delete_files(self, file_ids: List[Optional[str]]):
+        """
+        Borra ficheros del almacenamiento de la cuenta de OpenAI.
+
+        Args:
+            file_ids (List[Optional[str]]): Identificadores; se omiten los vacíos.
+        """
+        for file_id in file_ids:
+            if not file_id:
+                continue
+            try:
+                self.client.files.delete(file_id)
+            except Exception as e:
+                logger.warning("No se pudo borrar el fichero %s: %s", file_id, e)
+
+    def _head_text(self, texto: str, chunks: Optional[List[str]]) -> str:
+        """
+        Obtiene el inicio del artículo (resumen e introducción).
+
+        Los pasos "head" no pasan por `_fit_context_async`, así que el
+        resultado se recorta a `HEAD_MAX_CHARS` y al presupuesto de tokens.
+
+        Args:
+            texto (str): Texto completo del artículo.
+            chunks (Optional[List[str]]): Texto del artículo por páginas.
+
+        Returns:
+            str: Texto de las primeras páginas, o los primeros caracteres del
+                texto si no se dispone de las páginas.
+        """
+        head = "\n".join(chunks[:HEAD_PAGES]).strip() if chunks else ""
+        head = (head or texto)[:HEAD_MAX_CHARS]
+
+        budget = self._text_budget()
+        tokens = self._encoding.encode(head)
+        if len(tokens) > budget:
+            head = self._encoding.decode(tokens[:budget])
+        return head
+
+    @staticmethod
+    def _step_context(
+        step: AnalysisStep,
+        texto: str,
+        head: str,
+        resumen: Optional[str]
+    ) -> str:
+        """
+        Selecciona el texto que se envía al modelo según el alcance del paso.
+
+        Args:
+            step (AnalysisStep): Paso de análisis.
+            texto (str): Texto completo del artículo.
+            head (str): Inicio del artículo.
+            resumen (Optional[str]): Resultado del paso de resumen, si existe.
+
+        Returns:
+            str: Contexto para el paso. Si el resumen no está disponible, los
+                pasos con alcance "summary" reciben el texto completo.
+        """
+        if step.scope == "head":
+            return head
+        if not ArticleAnalyzer._needs_full_text(step, resumen):
+            return f"Resumen del artículo:\n\n{resumen}"
+        return texto
+
+    @staticmethod
+    def _needs_full_text(step: AnalysisStep, resumen: Optional[str]) -> bool:
+        """
+        Indica si el contexto de un paso será el texto completo del artículo.
+
+        Args:
+            step (AnalysisStep): Paso de análisis.
+            resumen (Optional[str]): Resultado del paso de resumen, si existe.
+
+        Returns:
+            bool: True si `_step_context` devolverá el texto completo.
+        """
+        if step.scope == "head":
+            return False
+        if step.scope == "summary" and resumen and not resumen.startswith("Error:"):
+            return False
+        return True
+
+    @staticmethod
+    def _build_messages(texto: str, step: AnalysisStep) -> List[Dict[str, str]]:
+        """
+        Construye los mensajes de la petición de un paso.
+
+        El texto del artículo va al principio, en el mensaje de sistema, y la
+        consulta del paso al final. Así todas las peticiones de un mismo
+        artículo comparten un prefijo largo e idéntico que la caché de prompts
+        de OpenAI reutiliza, en lugar de diferir desde el primer token.
+
+        Args:
+            texto (str): Texto que se envía como contexto.
+            step (AnalysisStep): Paso de análisis.
+
+        Returns:
+            List[Dict[str, str]]: Mensajes para la API de chat.
+        """
+        return [
+            {"role": "system", "content": SYSTEM_PREAMBLE + texto},
+            {"role": "user", "content": step.prompt}
+        ]
+
+    def _request_kwargs(self, texto: str, step: AnalysisStep) -> Dict[str, Any]:
+        """
+        Construye los argumentos de una petición de chat en streaming.
+
+        Parte de `_base_kwargs` y sólo sustituye el modelo si el paso
+        define uno propio.
+
+        Args:
+            texto (str): Texto que se envía como contexto.
+            step (AnalysisStep): Paso de análisis.
+
+        Returns:
+            Dict[str, Any]: Argumentos para `chat.completions.create`.
+        """
+        kwargs = {**self._base_kwargs, "messages": self._build_messages(texto, step), "stream": True}
+        if step.model:
+            kwargs["model"] = step.model
+        return kwargs
+
+    def _resolve_cache_hashes(self, texto: str) -> List[str]:
+        """
+        Determina los hashes de artículo bajo los que buscar respuestas en caché.
+
+        El primero es siempre el hash exacto del texto. Si la caché semántica
+        está activa y el artículo es nuevo, se calcula su embedding una sola vez
+        y se añade el hash del artículo similar más cercano, si lo hay. El
+        embedding no se registra hasta que `_put_cached` guarda una respuesta:
+        un artículo sin respuestas podría tapar a otro similar que sí las tiene.
+
+        Args:
+            texto (str): Texto del artículo.
+
+        Returns:
+            List[str]: Hashes en orden de preferencia.
+        """
+        text_hash = self.cache.text_hash(texto)
+        hashes = [text_hash]
+
+        if self.cache.semantic_enabled and not self.cache.has_article(text_hash):
+            try:
+                response = self.client.embeddings.create(
+                    model=EMBEDDING_MODEL,
+                    input=texto[:EMBEDDING_MAX_CHARS]
+                )
+                embedding = response.data[0].embedding
+                similar = self.cache.find_similar(embedding)
+                if similar:
+                    hashes.append(similar)
+                self._pending_embeddings[text_hash] = embedding
+
+            except Exception as e:
+                logger.warning("No se pudo consultar la caché semántica: %s", e)
+
+        return hashes
+
+    def _get_cached(
+        self,
+        hashes: List[str],
+        step: AnalysisStep,
+        model: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Busca la respuesta de un paso en la caché.
+
+        Args:
+            hashes (List[str]): Hashes de artículo en orden de preferencia.
+            step (AnalysisStep): Paso de análisis.
+            model (Optional[str]): Modelo que genera la respuesta (por
+                defecto, el del paso o el del analizador).
+
+        Returns:
+            Optional[str]: Respuesta almacenada, o None si no hay acierto.
+        """
+        model = model or step.model or self.model
+        for text_hash in hashes:
+            resultado = self.cache.get(self.cache.make_key(model, step.name, text_hash))
+            if resultado is not None:
+                logger.debug("Respuesta en caché para: %s", step.name)
+                # Copiar al hash propio para que la próxima vez sea un acierto exacto
+                if text_hash != hashes[0]:
+                    self._put_cached(hashes, step, resultado, model)
+                return resultado
+        return None
+
+    def _put_cached(
+        self,
+        hashes: List[str],
+        step: AnalysisStep,
+        resultado: str,
+        model: Optional[str] = None
+    ):
+        """
+        Guarda en caché la respuesta de un paso, salvo que sea un error.
+
+        Con la primera respuesta guardada de un artículo nuevo se registra
+        también su embedding en la caché semántica.
+        """
+        if hashes and not resultado.startswith("Error:"):
+            model = model or step.model or self.model
+            self.cache.set(self.cache.make_key(model, step.name, hashes[0]), resultado)
+
+            embedding = self._pending_embeddings.pop(hashes[0], None)
+            if embedding is not None:
+                try:
+                    self.cache.add_article(hashes[0], embedding)
+                except Exception as e:
+                    logger.warning("No se pudo registrar el artículo en la caché semántica: %s", e)
+
+    def _analyze_step(
+        self,
+        texto: str,
+        step: AnalysisStep,
+        on_token: Optional[Callable[[str], None]] = None
+    ) -> str:
         """
         Ejecuta un paso individual del análisis.
 
         Args:
             texto (str): Texto del artículo.
             step (AnalysisStep): Paso de análisis a ejecutar.
+            on_token (Optional[Callable]): Función que recibe cada fragmento de
+                la respuesta según llega.
 
         Returns:
             str: Resultado del análisis.
         """
         try:
             response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": step.prompt},
-                    {"role": "user", "content": texto}
-                ],
-                max_tokens=self.max_tokens
+                **self._request_kwargs(texto, step)
             )
 
-            if response.choices and len(response.choices) > 0:
-                return response.choices[0].message.content.strip()
-            else:
-                return "Error: No se obtuvo respuesta del modelo"
+            partes = []
+            for chunk in response:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content or ""
+                if delta:
+                    partes.append(delta)
+                    if on_token:
+                        on_token(delta)
+
+            return "".join(partes).strip() or "Error: No se obtuvo respuesta del modelo"
 
         except Exception as e:
-            logger.error(f"Error en llamada a OpenAI: {e}")
+            logger.error("Error en llamada a OpenAI: %s", e)
             raise
 
     def analyze_custom_step(
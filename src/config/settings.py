@@ -24,10 +24,26 @@ class Config:
     # Configuración de OpenAI
     OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-2024-08-06")
     MAX_TOKENS: int = int(os.getenv("MAX_TOKENS", "1024"))
+    CONTEXT_TOKENS: int = int(os.getenv("CONTEXT_TOKENS", "128000"))
+
+    # Límites de tasa de la cuenta (ajustar al nivel de uso de la organización)
+    MAX_RPM: int = int(os.getenv("MAX_RPM", "500"))
+    MAX_TPM: int = int(os.getenv("MAX_TPM", "450000"))
+
+    # Segundos entre consultas del estado de un trabajo de la Batch API
+    BATCH_POLL_INTERVAL: float = float(os.getenv("BATCH_POLL_INTERVAL", "30"))
+
+    # Modo de extracción de texto de los PDF: "fast", "blocks" o "raw"
+    PDF_TEXT_LAYOUT: str = os.getenv("PDF_TEXT_LAYOUT", "fast")
 
     # Directorios
     OUTPUT_DIR = BASE_DIR / "output"
     TEMP_DIR = BASE_DIR / "temp"
+    CACHE_DIR = BASE_DIR / "cache"
+
+    # Caché de respuestas
+    SEMANTIC_CACHE: bool = os.getenv("SEMANTIC_CACHE", "true").lower() == "true"
+    CACHE_SIMILARITY_THRESHOLD: float = float(os.getenv("CACHE_SIMILARITY_THRESHOLD", "0.95"))
 
     @classmethod
     def validate(cls) -> bool:
@@ -43,6 +59,7 @@ class Config:
         # Crear directorios necesarios
         cls.OUTPUT_DIR.mkdir(exist_ok=True)
         cls.TEMP_DIR.mkdir(exist_ok=True)
+        cls.CACHE_DIR.mkdir(exist_ok=True)
 
         return True
 
@@ -2,15 +2,20 @@
 Ventana principal de la aplicación con interfaz Tkinter.
 """
 
+import io
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, filedialog, messagebox, scrolledtext
 from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 import threading
 import logging
 from datetime import datetime
 
 from ..config.settings import Config
 from ..utils.pdf_extractor import PDFExtractor
+from ..utils.rate_limiter import ModelRateLimiter
+from ..utils.response_cache import ResponseCache
 from ..analyzer import ArticleAnalyzer
 
 logger = logging.getLogger(__name__)
@@ -19,6 +24,9 @@ logger = logging.getLogger(__name__)
 class MainWindow:
     """Ventana principal de la aplicación."""
 
+    # Intervalo (ms) con el que se vuelcan a los widgets las actualizaciones pendientes
+    UPDATE_INTERVAL_MS = 50
+
     def __init__(self, root: tk.Tk):
         """
         Inicializa la ventana principal.
@@ -34,15 +42,33 @@ class MainWindow:
         # Variables
         self.pdf_path = tk.StringVar()
         self.api_key = tk.StringVar()
+        self.batch_mode = tk.BooleanVar(value=False)
         self.analyzer: ArticleAnalyzer = None
+        # Analizadores reutilizables (mantienen abiertas sus conexiones HTTP)
+        self._analyzer_cache: Dict[Tuple[str, str, int], ArticleAnalyzer] = {}
         self.current_results = {}
+        # Texto completo de `current_results`, formateado una sola vez
+        self._formatted_full: Optional[str] = None
         self.is_analyzing = False
+        # Pestañas de resultados reutilizables (frame, widget de texto)
+        self._result_tabs: List[Tuple[ttk.Frame, scrolledtext.ScrolledText]] = []
+
+        # Actualizaciones de la interfaz pedidas desde el hilo de análisis
+        self._pending_update = {}
+        self._update_lock = threading.Lock()
+        self.response_cache = ResponseCache(
+            Config.CACHE_DIR,
+            similarity_threshold=Config.CACHE_SIMILARITY_THRESHOLD,
+            semantic=Config.SEMANTIC_CACHE
+        )
+        self.rate_limiter = ModelRateLimiter(Config.MAX_RPM, Config.MAX_TPM)
 
         # Configurar estilo
         self.setup_style()
 
         # Crear widgets
         self.create_widgets()
+        self.root.after(self.UPDATE_INTERVAL_MS, self._drain_updates)
 
         # Cargar API key desde config si existe
         self.load_api_key()
@@ -124,6 +150,13 @@ class MainWindow:
             command=self.select_pdf
         ).grid(row=1, column=2, pady=5)
 
+        # Modo de ejecución
+        ttk.Checkbutton(
+            config_frame,
+            text="Modo económico (Batch API)",
+            variable=self.batch_mode
+        ).grid(row=2, column=1, sticky=tk.W, padx=5, pady=5)
+
         # Botón de analizar
         self.analyze_button = ttk.Button(
             config_frame,
@@ -131,7 +164,7 @@ class MainWindow:
             command=self.start_analysis,
             style='Success.TButton'
         )
-        self.analyze_button.grid(row=2, column=0, columnspan=3, pady=10)
+        self.analyze_button.grid(row=3, column=0, columnspan=3, pady=10)
 
     def create_analysis_frame(self, parent):
         """Crea el frame de análisis y resultados."""
@@ -178,6 +211,12 @@ class MainWindow:
             command=self.clear_results
         ).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(
+            button_frame,
+            text="🧹 Vaciar caché",
+            command=self.clear_cache
+        ).pack(side=tk.LEFT, padx=5)
+
     def create_full_view_tab(self):
         """Crea la pestaña de vista completa."""
         full_frame = ttk.Frame(self.notebook)
@@ -224,7 +263,7 @@ class MainWindow:
         )
         if filename:
             self.pdf_path.set(filename)
-            logger.info(f"PDF seleccionado: {filename}")
+            logger.info("PDF seleccionado: %s", filename)
             self.update_status(f"PDF seleccionado: {Path(filename).name}")
 
     def start_analysis(self):
@@ -244,6 +283,8 @@ class MainWindow:
 
         # Limpiar resultados anteriores
         self.clear_results()
+        if not self.batch_mode.get():
+            self.prepare_stream_view()
 
         # Deshabilitar botón
         self.analyze_button.config(state='disabled')
@@ -260,51 +301,88 @@ class MainWindow:
             self.update_status("Extrayendo texto del PDF...")
             self.update_progress("Extrayendo texto...", 0, 10)
 
-            # Extraer texto del PDF
-            texto = PDFExtractor.extract_text(self.pdf_path.get())
+            # Extraer texto del PDF (conservando la división por páginas) e
+            # inicializar el analizador a la vez: son tareas independientes
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                fut_paginas = executor.submit(PDFExtractor.extract_pages, self.pdf_path.get())
+                fut_analyzer = executor.submit(self.get_analyzer, self.api_key.get())
 
-            if not texto:
-                self.show_error("El PDF no contiene texto extraíble")
-                return
+                paginas = fut_paginas.result()
+                self.update_progress("Texto extraído", 1, 10)
 
-            self.update_progress("Texto extraído", 1, 10)
+                self.analyzer = fut_analyzer.result()
+                self.update_progress("Analizador inicializado", 2, 10)
 
-            # Inicializar analizador
-            self.update_status("Inicializando analizador...")
-            self.analyzer = ArticleAnalyzer(
-                api_key=self.api_key.get(),
-                model=Config.OPENAI_MODEL,
-                max_tokens=Config.MAX_TOKENS
-            )
+            if not paginas:
+                self.show_error("El PDF no contiene texto extraíble")
+                return
 
-            self.update_progress("Analizador inicializado", 2, 10)
+            texto = PDFExtractor.normalize_whitespace("\n".join(paginas))
 
             # Ejecutar análisis con callback de progreso
-            self.update_status("Analizando artículo...")
-
-            results = self.analyzer.analyze_article(
-                texto,
-                progress_callback=self.progress_callback
-            )
-
-            # Guardar y mostrar resultados
+            if self.batch_mode.get():
+                self.update_status("Analizando artículo (Batch API, puede tardar)...")
+                results = self.analyzer.analyze_article_batched(
+                    texto,
+                    progress_callback=self.progress_callback,
+                    poll_interval=Config.BATCH_POLL_INTERVAL,
+                    chunks=paginas
+                )
+            else:
+                self.update_status("Analizando artículo...")
+                results = self.analyzer.analyze_article(
+                    texto,
+                    progress_callback=self.progress_callback,
+                    chunks=paginas,
+                    token_callback=self._queue_token
+                )
+
+            # Guardar y formatear los resultados aquí, fuera del hilo de Tk,
+            # y mostrarlos después del texto en streaming
             self.current_results = results
-            self.display_results(results)
+            self._formatted_full = self.format_full_results(results)
+            self._queue_update("results", results)
 
             self.update_status("¡Análisis completado exitosamente!")
-            messagebox.showinfo("Éxito", "El análisis se completó correctamente")
+            self._queue_update("info", "El análisis se completó correctamente")
 
         except FileNotFoundError as e:
             self.show_error(f"Archivo no encontrado: {e}")
 
         except Exception as e:
-            logger.error(f"Error durante el análisis: {e}", exc_info=True)
+            logger.error("Error durante el análisis: %s", e, exc_info=True)
             self.show_error(f"Error durante el análisis: {str(e)}")
 
         finally:
             self.is_analyzing = False
-            self.root.after(0, lambda: self.analyze_button.config(state='normal'))
-            self.root.after(0, lambda: self.progress_bar.config(value=0))
+            self._queue_update("finished", True)
+
+    def get_analyzer(self, api_key: str) -> ArticleAnalyzer:
+        """
+        Obtiene un analizador para la configuración actual.
+
+        Los analizadores se conservan durante toda la sesión para reutilizar
+        sus clientes de OpenAI y las conexiones TLS ya establecidas.
+
+        Args:
+            api_key (str): API key de OpenAI.
+
+        Returns:
+            ArticleAnalyzer: Analizador listo para usar.
+        """
+        key = (api_key, Config.OPENAI_MODEL, Config.MAX_TOKENS)
+        analyzer = self._analyzer_cache.get(key)
+        if analyzer is None:
+            analyzer = ArticleAnalyzer(
+                api_key=api_key,
+                model=Config.OPENAI_MODEL,
+                max_tokens=Config.MAX_TOKENS,
+                cache=self.response_cache,
+                context_tokens=Config.CONTEXT_TOKENS,
+                limiter=self.rate_limiter
+            )
+            self._analyzer_cache[key] = analyzer
+        return analyzer
 
     def progress_callback(self, step_name: str, step_description: str, current: int, total: int):
         """
@@ -318,7 +396,25 @@ class MainWindow:
         """
         progress = (current / total) * 100
         self.update_progress(f"{step_description} ({current}/{total})", progress, 100)
-        logger.info(f"Progreso: {current}/{total} - {step_description}")
+        logger.info("Progreso: %d/%d - %s", current, total, step_description)
+
+    def prepare_stream_view(self):
+        """
+        Prepara la vista completa para recibir las respuestas en streaming.
+
+        Inserta la cabecera de cada paso seguida de una marca de Tk con
+        gravedad derecha: cada fragmento insertado en la marca queda detrás
+        del anterior, aunque los pasos lleguen intercalados.
+        """
+        self.results_text.delete(1.0, tk.END)
+        for step in ArticleAnalyzer.ANALYSIS_STEPS:
+            self.results_text.insert(
+                tk.END,
+                f"{'-' * 80}\n{step.description.upper()}\n{'-' * 80}\n\n\n"
+            )
+            mark = f"stream_{step.name}"
+            self.results_text.mark_set(mark, "end-3c")
+            self.results_text.mark_gravity(mark, tk.RIGHT)
 
     def display_results(self, results: dict):
         """
@@ -327,42 +423,68 @@ class MainWindow:
         Args:
             results (dict): Diccionario con los resultados.
         """
-        # Limpiar pestañas anteriores (excepto la primera)
-        for i in range(len(self.notebook.tabs()) - 1, 0, -1):
-            self.notebook.forget(i)
-
         # Actualizar vista completa
         self.results_text.delete(1.0, tk.END)
-        full_text = self.format_full_results(results)
+        if results is self.current_results:
+            full_text = self.full_results_text()
+        else:
+            full_text = self.format_full_results(results)
         self.results_text.insert(1.0, full_text)
 
-        # Crear pestañas individuales para cada sección
+        # Rellenar una pestaña por sección, reutilizando las existentes
+        visibles = 0
         for step in ArticleAnalyzer.ANALYSIS_STEPS:
             if step.name in results:
-                self.create_result_tab(step.description, results[step.name])
+                self.show_result_tab(visibles, step.description, results[step.name])
+                visibles += 1
 
-    def create_result_tab(self, title: str, content: str):
+        self.hide_result_tabs(start=visibles)
+
+    def show_result_tab(self, index: int, title: str, content: str):
         """
-        Crea una pestaña con un resultado específico.
+        Muestra un resultado en la pestaña indicada, creándola si aún no existe.
+
+        Las pestañas se conservan entre análisis y sólo se reescribe su
+        título y contenido, evitando destruir y recrear los widgets.
 
         Args:
+            index (int): Posición de la pestaña entre las de resultados.
             title (str): Título de la pestaña.
             content (str): Contenido a mostrar.
         """
-        frame = ttk.Frame(self.notebook)
-        self.notebook.add(frame, text=title[:20])
+        if index < len(self._result_tabs):
+            frame, text_widget = self._result_tabs[index]
+            self.notebook.add(frame)  # la vuelve a mostrar si estaba oculta
+            self.notebook.tab(frame, text=title[:20])
+        else:
+            frame = ttk.Frame(self.notebook)
+            self.notebook.add(frame, text=title[:20])
+
+            text_widget = scrolledtext.ScrolledText(
+                frame,
+                wrap=tk.WORD,
+                width=80,
+                height=20,
+                font=('Courier', 10)
+            )
+            text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+            self._result_tabs.append((frame, text_widget))
 
-        text_widget = scrolledtext.ScrolledText(
-            frame,
-            wrap=tk.WORD,
-            width=80,
-            height=20,
-            font=('Courier', 10)
-        )
-        text_widget.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        text_widget.config(state='normal')
+        text_widget.delete(1.0, tk.END)
         text_widget.insert(1.0, content)
         text_widget.config(state='disabled')
 
+    def hide_result_tabs(self, start: int = 0):
+        """
+        Oculta las pestañas de resultados a partir de una posición.
+
+        Args:
+            start (int): Primera pestaña a ocultar.
+        """
+        for frame, _ in self._result_tabs[start:]:
+            self.notebook.hide(frame)
+
     def format_full_results(self, results: dict) -> str:
         """
         Formatea todos los resultados para mostrar.
@@ -373,22 +495,36 @@ class MainWindow:
         Returns:
             str: Texto formateado.
         """
-        output = []
-        output.append("=" * 80)
-        output.append("ANÁLISIS COMPLETO DEL ARTÍCULO CIENTÍFICO")
-        output.append("=" * 80)
-        output.append(f"\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        output.append(f"Archivo: {Path(self.pdf_path.get()).name}")
-        output.append("\n")
+        separador = "-" * 80
+        buf = io.StringIO()
+        buf.write("=" * 80)
+        buf.write("\nANÁLISIS COMPLETO DEL ARTÍCULO CIENTÍFICO\n")
+        buf.write("=" * 80)
+        buf.write(f"\n\nFecha: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        buf.write(f"\nArchivo: {Path(self.pdf_path.get()).name}\n\n")
 
         for step in ArticleAnalyzer.ANALYSIS_STEPS:
             if step.name in results:
-                output.append("\n" + "-" * 80)
-                output.append(f"\n{step.description.upper()}")
-                output.append("-" * 80)
-                output.append(f"\n{results[step.name]}\n")
+                buf.write(
+                    f"\n\n{separador}\n\n{step.description.upper()}\n"
+                    f"{separador}\n\n{results[step.name]}\n"
+                )
 
-        return "\n".join(output)
+        return buf.getvalue()
+
+    def full_results_text(self) -> str:
+        """
+        Obtiene el texto completo de los resultados actuales.
+
+        El texto se formatea una sola vez por análisis y se reutiliza al
+        mostrarlo y al guardarlo.
+
+        Returns:
+            str: Texto formateado de `current_results`.
+        """
+        if self._formatted_full is None:
+            self._formatted_full = self.format_full_results(self.current_results)
+        return self._formatted_full
 
     def save_results(self):
         """Guarda los resultados en un archivo."""
@@ -404,42 +540,115 @@ class MainWindow:
 
         if filename:
             try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(self.format_full_results(self.current_results))
+                datos = self.full_results_text().encode('utf-8')
+                with open(filename, 'wb') as f:
+                    f.write(datos)
 
                 messagebox.showinfo("Éxito", f"Resultados guardados en:\n{filename}")
-                logger.info(f"Resultados guardados en: {filename}")
+                logger.info("Resultados guardados en: %s", filename)
 
             except Exception as e:
                 messagebox.showerror("Error", f"Error al guardar: {e}")
-                logger.error(f"Error al guardar resultados: {e}")
+                logger.error("Error al guardar resultados: %s", e)
 
     def clear_results(self):
         """Limpia los resultados mostrados."""
         self.results_text.delete(1.0, tk.END)
         self.current_results = {}
+        self._formatted_full = None
 
-        # Eliminar pestañas excepto la primera
-        for i in range(len(self.notebook.tabs()) - 1, 0, -1):
-            self.notebook.forget(i)
+        # Ocultar pestañas de resultados (se reutilizan en el próximo análisis)
+        self.hide_result_tabs()
 
         self.update_status("Resultados limpiados")
 
+    def clear_cache(self):
+        """Vacía la caché de respuestas del modelo."""
+        try:
+            self.response_cache.clear()
+            self.update_status("Caché vaciada")
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al vaciar la caché: {e}")
+            logger.error("Error al vaciar la caché: %s", e)
+
     def update_status(self, message: str):
         """Actualiza la barra de estado."""
-        self.root.after(0, lambda: self.status_label.config(text=message))
+        self._queue_update("status", message)
 
     def update_progress(self, message: str, value: float, maximum: float):
         """Actualiza la barra de progreso."""
-        def update():
-            self.progress_label.config(text=message)
-            self.progress_bar.config(value=value, maximum=maximum)
+        self._queue_update("progress", (message, value, maximum))
+
+    def _queue_update(self, key: str, value):
+        """
+        Registra una actualización pendiente de la interfaz.
+
+        Sólo se conserva el último valor de cada clave; `_drain_updates` lo
+        aplica en el hilo de Tk en el siguiente ciclo.
+
+        Args:
+            key (str): Tipo de actualización.
+            value: Datos de la actualización.
+        """
+        with self._update_lock:
+            self._pending_update[key] = value
+
+    def _queue_token(self, step_name: str, delta: str):
+        """
+        Registra un fragmento de respuesta recibido en streaming.
+
+        Args:
+            step_name (str): Paso al que pertenece el fragmento.
+            delta (str): Texto recibido.
+        """
+        with self._update_lock:
+            self._pending_update.setdefault("tokens", []).append((step_name, delta))
+
+    def _drain_updates(self):
+        """Aplica las actualizaciones pendientes y se vuelve a programar."""
+        pending = {}
+        try:
+            with self._update_lock:
+                pending = self._pending_update
+                self._pending_update = {}
+
+            for step_name, delta in pending.get("tokens", ()):
+                self.results_text.insert(f"stream_{step_name}", delta)
+
+            if "results" in pending:
+                self.display_results(pending["results"])
+
+            if "status" in pending:
+                self.status_label.config(text=pending["status"])
+
+            if "progress" in pending:
+                message, value, maximum = pending["progress"]
+                self.progress_label.config(text=message)
+                self.progress_bar.config(value=value, maximum=maximum)
+
+        except Exception as e:
+            logger.error("Error al actualizar la interfaz: %s", e, exc_info=True)
+
+        finally:
+            # Reprogramar siempre: si el bucle se detiene, la interfaz deja de
+            # actualizarse durante el resto de la sesión
+            self.root.after(self.UPDATE_INTERVAL_MS, self._drain_updates)
+
+            if pending.get("finished"):
+                self.analyze_button.config(state='normal')
+                self.progress_bar.config(value=0)
 
-        self.root.after(0, update)
+            # Los diálogos son modales: se muestran lo último, con el resto de
+            # la interfaz ya actualizada y el siguiente ciclo programado
+            if "error" in pending:
+                messagebox.showerror("Error", pending["error"])
+            if "info" in pending:
+                messagebox.showinfo("Éxito", pending["info"])
 
     def show_error(self, message: str):
         """Muestra un mensaje de error."""
-        self.root.after(0, lambda: messagebox.showerror("Error", message))
+        self._queue_update("error", message)
         self.update_status(f"Error: {message}")
 
     def run(self):
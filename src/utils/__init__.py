@@ -4,5 +4,7 @@ Módulo de utilidades para el analizador de artículos.
 
 from .pdf_extractor import PDFExtractor
 from .logger import setup_logger
+from .rate_limiter import AsyncLimiter, ModelRateLimiter
+from .response_cache import ResponseCache
 
-__all__ = ['PDFExtractor', 'setup_logger']
+__all__ = ['PDFExtractor', 'setup_logger', 'AsyncLimiter', 'ModelRateLimiter', 'ResponseCache']
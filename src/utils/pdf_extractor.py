@@ -2,24 +2,114 @@
 Módulo para extracción de texto desde archivos PDF.
 """
 
-import fitz  # PyMuPDF
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Optional
+from typing import Iterator, List, Literal, Optional, Sequence, Tuple
+import functools
+import hashlib
 import logging
+import mmap
+import multiprocessing
+import os
+import re
+import tempfile
+
+from ..config.settings import Config
 
 logger = logging.getLogger(__name__)
 
+# PyMuPDF se importa en el primer uso (ver `_fitz`): cargar su extensión C
+# es costoso y muchos usos del módulo no llegan a abrir ningún PDF
+fitz = None
+
+
+def _fitz():
+    """Importa PyMuPDF la primera vez que se necesita y lo devuelve."""
+    global fitz
+    if fitz is None:
+        import fitz as _pymupdf
+        # Los avisos de MuPDF sobre PDFs defectuosos se siguen acumulando en
+        # TOOLS.mupdf_warnings(), pero sin escribir en stderr en cada página
+        _pymupdf.TOOLS.mupdf_display_errors(False)
+        fitz = _pymupdf
+    return fitz
+
+
+def _shrink_store():
+    """Vacía la caché global de MuPDF (fuentes, imágenes) tras un documento."""
+    if fitz is not None:
+        fitz.TOOLS.store_shrink(100)
+
+
+@functools.lru_cache(maxsize=None)
+def _text_flags() -> int:
+    """
+    Opciones de get_text: sólo texto en prosa, sin imágenes ni ligaduras,
+    uniendo las palabras cortadas con guion al final de línea.
+    """
+    pymupdf = _fitz()
+    return (
+        pymupdf.TEXTFLAGS_TEXT
+        & ~pymupdf.TEXT_PRESERVE_IMAGES
+        & ~pymupdf.TEXT_PRESERVE_LIGATURES
+    ) | pymupdf.TEXT_DEHYPHENATE
+
+
+# Espacios horizontales repetidos (incluido el espacio duro)
+_WS = re.compile(r"[ \t\u00A0]+")
+# Tres o más saltos de línea, aunque las líneas intermedias tengan espacios
+_NL = re.compile(r"\n[ \t]*\n(?:[ \t]*\n)+")
+
 
 class PDFExtractor:
     """Clase para extraer texto de documentos PDF."""
 
+    # Páginas mínimas por proceso. Arrancar un proceso "spawn" cuesta
+    # ~0,5 s (vuelve a importar main.py: tkinter, la interfaz, openai,
+    # tiktoken, faiss) frente a ~1-2 ms por página en serie, así que por
+    # debajo de unas 250 páginas por proceso no se recupera el arranque
+    MIN_PAGES_PER_WORKER = 250
+
+    # Número mínimo de páginas para repartir la extracción entre procesos:
+    # con 1000 páginas y 2 CPUs se queda cerca del punto de equilibrio; los
+    # artículos normales siempre se extraen en serie
+    PARALLEL_MIN_PAGES = 4 * MIN_PAGES_PER_WORKER
+
+    # Máximo de procesos de extracción (más allá apenas escala)
+    MAX_WORKERS = 8
+
+    # Separador de páginas en los archivos de caché (salto de página)
+    PAGE_SEPARATOR = "\f"
+
+    # Modos de extracción de texto por página
+    LAYOUTS = ("fast", "blocks", "raw")
+
+    # Cabecera de un PDF y zona del inicio del archivo donde se busca
+    # (los lectores toleran unos bytes basura antes de ella)
+    PDF_MAGIC = b"%PDF-"
+    MAGIC_SEARCH_BYTES = 1024
+
     @staticmethod
-    def extract_text(pdf_path: str) -> Optional[str]:
+    def extract_text(
+        pdf_path: str,
+        use_cache: bool = True,
+        layout: Optional[Literal["fast", "blocks", "raw"]] = None,
+        force_refresh: bool = False,
+        pages: Optional[Sequence[int]] = None,
+        parallel: bool = True
+    ) -> Optional[str]:
         """
         Extrae texto de un archivo PDF.
 
         Args:
             pdf_path (str): Ruta al archivo PDF.
+            use_cache (bool): Si se reutiliza el texto extraído previamente.
+            layout (Optional[str]): Modo de extracción (ver `extract_pages`).
+            force_refresh (bool): Si se ignora la caché y se vuelve a extraer.
+            pages (Optional[Sequence[int]]): Páginas a extraer (ver `extract_pages`).
+            parallel (bool): Si se permite repartir las páginas entre
+                procesos (ver `extract_pages`).
 
         Returns:
             Optional[str]: Texto extraído del PDF, o None si hay error.
@@ -28,55 +118,647 @@ class PDFExtractor:
             FileNotFoundError: Si el archivo no existe.
             ValueError: Si el archivo no es un PDF válido.
         """
+        paginas = PDFExtractor.extract_pages(
+            pdf_path,
+            use_cache=use_cache,
+            layout=layout,
+            force_refresh=force_refresh,
+            pages=pages,
+            parallel=parallel
+        )
+        if paginas is None:
+            return None
+        # Unir una sola vez, omitiendo páginas vacías, y recortar al final
+        return PDFExtractor.normalize_whitespace("\n".join(p for p in paginas if p))
+
+    @staticmethod
+    def extract_text_batch(
+        pdf_paths: List[str],
+        max_workers: Optional[int] = None
+    ) -> List[Optional[str]]:
+        """
+        Extrae el texto de varios PDFs en paralelo, un proceso por archivo.
+
+        Cada proceso extrae su archivo en serie, sin abrir otro pool para
+        las páginas. Los archivos ya extraídos se leen de la caché sin
+        arrancar ningún proceso y las rutas repetidas se extraen una sola
+        vez. Si un archivo tumba su proceso, los que quedaban se reenvían a
+        un pool nuevo y sólo ese archivo queda sin texto.
+
+        Args:
+            pdf_paths (List[str]): Rutas a los archivos PDF.
+            max_workers (Optional[int]): Número de procesos (por defecto, CPUs).
+
+        Returns:
+            List[Optional[str]]: Texto de cada PDF en el mismo orden que
+                `pdf_paths`, o None para los que no se pudieron extraer.
+        """
+        unicos = list(dict.fromkeys(str(p) for p in pdf_paths))
+        por_ruta = {}
+        pendientes = []
+        for ruta in unicos:
+            texto = PDFExtractor._cached_text(ruta)
+            if texto is not None:
+                por_ruta[ruta] = texto
+            else:
+                pendientes.append(ruta)
+
+        if pendientes:
+            fallidos = PDFExtractor._run_batch(pendientes, max_workers, por_ruta)
+            # Un fallo de proceso rompe el pool entero y no indica qué archivo
+            # lo causó: se reintenta cada afectado en su propio proceso
+            for ruta in fallidos:
+                if PDFExtractor._run_batch([ruta], 1, por_ruta):
+                    logger.error("El proceso de extracción terminó abruptamente: %s", ruta)
+                    por_ruta[ruta] = None
+
+        return [por_ruta[str(p)] for p in pdf_paths]
+
+    @staticmethod
+    def _run_batch(
+        rutas: List[str],
+        max_workers: Optional[int],
+        resultados: dict
+    ) -> List[str]:
+        """
+        Extrae un grupo de PDFs en un pool de procesos.
+
+        Args:
+            rutas (List[str]): Rutas a los archivos PDF.
+            max_workers (Optional[int]): Número de procesos.
+            resultados (dict): Diccionario ruta -> texto que se completa.
+
+        Returns:
+            List[str]: Rutas que no terminaron porque el pool se rompió.
+        """
+        fallidos = []
+        with PDFExtractor._process_pool(max_workers) as executor:
+            futuros = {
+                executor.submit(PDFExtractor._extract_text_safe, ruta): ruta
+                for ruta in rutas
+            }
+            for futuro in as_completed(futuros):
+                ruta = futuros[futuro]
+                try:
+                    resultados[ruta] = futuro.result()
+                except BrokenProcessPool:
+                    fallidos.append(ruta)
+        return fallidos
+
+    @staticmethod
+    def _cached_text(pdf_path: str) -> Optional[str]:
+        """
+        Obtiene el texto de un PDF de la caché de extracción, sin abrirlo.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+
+        Returns:
+            Optional[str]: Texto en caché, o None si no lo hay.
+        """
         try:
-            # Validar que el archivo existe
-            path = Path(pdf_path)
-            if not path.exists():
-                raise FileNotFoundError(f"El archivo no existe: {pdf_path}")
+            with open(pdf_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                cache_file = PDFExtractor._cache_path(mm, Config.PDF_TEXT_LAYOUT)
+            if not cache_file.exists():
+                return None
+            paginas = cache_file.read_text(encoding='utf-8').split(PDFExtractor.PAGE_SEPARATOR)
 
-            if not path.suffix.lower() == '.pdf':
-                raise ValueError(f"El archivo no es un PDF: {pdf_path}")
+        except (OSError, ValueError):
+            return None
 
-            logger.info(f"Extrayendo texto de: {pdf_path}")
+        return PDFExtractor.normalize_whitespace("\n".join(p for p in paginas if p))
 
-            # Abrir el documento PDF
-            documento = fitz.open(pdf_path)
+    @staticmethod
+    def _extract_text_safe(pdf_path: str) -> Optional[str]:
+        """Extrae el texto de un PDF devolviendo None en lugar de lanzar errores."""
+        try:
+            # El paralelismo ya está en los archivos: nada de pools anidados
+            return PDFExtractor.extract_text(pdf_path, parallel=False)
+        except Exception as e:
+            logger.error("No se pudo extraer %s: %s", pdf_path, e)
+            return None
 
-            # Recopilar el texto de cada página
-            texto_completo = ""
-            total_paginas = len(documento)
+    @staticmethod
+    def normalize_whitespace(texto: str) -> str:
+        """
+        Normaliza los espacios del texto extraído.
 
-            for num_pagina, pagina in enumerate(documento, start=1):
-                logger.debug(f"Procesando página {num_pagina}/{total_paginas}")
-                texto_pagina = pagina.get_text()
-                texto_completo += texto_pagina + "\n"
+        Reduce cada secuencia de espacios y tabuladores a un solo espacio y
+        cada grupo de líneas en blanco a una sola, con dos expresiones
+        regulares precompiladas que recorren el texto una vez cada una.
 
-            # Cerrar el documento
-            documento.close()
+        Args:
+            texto (str): Texto a normalizar.
+
+        Returns:
+            str: Texto normalizado y sin espacios al principio ni al final.
+        """
+        return _NL.sub("\n\n", _WS.sub(" ", texto)).strip()
+
+    @staticmethod
+    def extract_pages(
+        pdf_path: str,
+        use_cache: bool = True,
+        layout: Optional[Literal["fast", "blocks", "raw"]] = None,
+        force_refresh: bool = False,
+        pages: Optional[Sequence[int]] = None,
+        parallel: bool = True
+    ) -> Optional[List[str]]:
+        """
+        Extrae el texto de un archivo PDF página a página.
+
+        El resultado se guarda en `Config.TEMP_DIR` con el hash del contenido
+        del archivo como nombre, de modo que volver a analizar el mismo PDF
+        no repite la extracción.
 
-            if not texto_completo.strip():
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+            use_cache (bool): Si se reutiliza el texto extraído previamente.
+            layout (Optional[str]): Modo de extracción por página. "fast"
+                (por defecto en `Config.PDF_TEXT_LAYOUT`) usa la extracción de
+                texto estándar en el orden del contenido; "blocks" une los
+                bloques ordenados por posición de arriba abajo, lo que mezcla
+                los párrafos de textos a dos columnas (ambos con
+                `_text_flags()`), y "raw" la primera sin ninguna opción.
+            force_refresh (bool): Si se ignora el texto en caché y se vuelve
+                a extraer (el resultado nuevo sí se guarda).
+            pages (Optional[Sequence[int]]): Índices de página (desde 0) a
+                extraer, por ejemplo `range(3)` para las tres primeras. Las
+                demás páginas no llegan a cargarse. Por defecto, todas.
+            parallel (bool): Si se permite repartir las páginas entre
+                procesos cuando hay al menos `PARALLEL_MIN_PAGES`. Los
+                trabajadores de `extract_text_batch` lo desactivan.
+
+        Returns:
+            Optional[List[str]]: Texto de cada página, en orden ascendente de
+                índice, o None si el PDF no contiene texto extraíble.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si el archivo no es un PDF válido.
+        """
+        try:
+            layout = layout or Config.PDF_TEXT_LAYOUT
+            if layout not in PDFExtractor.LAYOUTS:
+                raise ValueError(f"Modo de extracción no válido: {layout}")
+
+            path = PDFExtractor._validate_pdf(pdf_path)
+
+            seleccion = None
+            if pages is not None:
+                seleccion = sorted(set(pages))
+                if not seleccion:
+                    raise ValueError("No se indicó ninguna página a extraer")
+
+            # Mapear el archivo una sola vez: el mismo mapeo sirve para el hash
+            # y para entregar los bytes a PyMuPDF
+            cache_file = None
+            with open(path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    mm.madvise(mmap.MADV_SEQUENTIAL)
+
+                # Identificar el PDF por su contenido, no por la extensión
+                if mm.find(PDFExtractor.PDF_MAGIC, 0, PDFExtractor.MAGIC_SEARCH_BYTES) < 0:
+                    raise ValueError(f"El archivo no es un PDF: {pdf_path}")
+
+                if use_cache:
+                    cache_file = PDFExtractor._cache_path(mm, layout, seleccion)
+                    if not force_refresh and cache_file.exists():
+                        logger.info("Texto recuperado de caché: %s", pdf_path)
+                        return cache_file.read_text(encoding='utf-8').split(PDFExtractor.PAGE_SEPARATOR)
+
+                # PyMuPDF sólo acepta bytes/bytearray/BytesIO como stream (a un
+                # objeto mmap le haría read(), otra copia), así que se copia una
+                # sola vez tras el hash
+                datos = bytes(mm)
+
+            logger.info("Extrayendo texto de: %s", pdf_path)
+
+            try:
+                # Abrir el documento PDF; se cierra aunque falle la extracción
+                with _fitz().open(stream=datos, filetype="pdf") as documento:
+                    indices = PDFExtractor._page_indices(seleccion, len(documento))
+                    total_paginas = len(indices)
+                    paralelo = (
+                        parallel
+                        and total_paginas >= PDFExtractor.PARALLEL_MIN_PAGES
+                        and PDFExtractor._default_workers(total_paginas) > 1
+                    )
+
+                    if not paralelo:
+                        paginas = [None] * total_paginas
+                        for i, texto in enumerate(PDFExtractor._iter_document(documento, layout, indices)):
+                            paginas[i] = texto
+
+                # Cada proceso abre el archivo por su cuenta, ya cerrado el documento
+                if paralelo:
+                    paginas = PDFExtractor._extract_pages_parallel(str(path), indices, layout)
+            finally:
+                # Con todos los documentos ya cerrados, no crece entre archivos
+                _shrink_store()
+
+            if all(not pagina or pagina.isspace() for pagina in paginas):
                 logger.warning("El PDF no contiene texto extraíble")
                 return None
 
             logger.info(
-                f"Extracción completada: {len(texto_completo)} caracteres, "
-                f"{total_paginas} páginas"
+                "Extracción completada: %d caracteres, %d páginas",
+                sum(len(p) for p in paginas),
+                total_paginas
             )
 
-            return texto_completo.strip()
+            if cache_file is not None:
+                PDFExtractor._write_cache(cache_file, paginas)
+
+            return paginas
 
         except FileNotFoundError as e:
-            logger.error(f"Archivo no encontrado: {e}")
+            logger.error("Archivo no encontrado: %s", e)
             raise
 
         except ValueError as e:
-            logger.error(f"Error de validación: {e}")
+            logger.error("Error de validación: %s", e)
             raise
 
         except Exception as e:
-            logger.error(f"Error al extraer texto del PDF: {e}")
+            logger.error("Error al extraer texto del PDF: %s", e)
             raise RuntimeError(f"Error al procesar el PDF: {e}")
 
+    @staticmethod
+    def iter_pages(
+        pdf_path: str,
+        layout: Optional[Literal["fast", "blocks", "raw"]] = None,
+        pages: Optional[Sequence[int]] = None
+    ) -> Iterator[str]:
+        """
+        Recorre el texto de un PDF página a página sin acumularlo.
+
+        A diferencia de `extract_pages`, no carga el archivo en memoria ni usa
+        la caché: pensado para consumidores que trocean o tokenizan el texto
+        sobre la marcha y no necesitan más de una página a la vez.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+            layout (Optional[str]): Modo de extracción (ver `extract_pages`).
+            pages (Optional[Sequence[int]]): Índices de página (desde 0) a
+                recorrer, en el orden indicado. Por defecto, todas.
+
+        Yields:
+            str: Texto de cada página, en orden.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si el archivo no es un PDF válido.
+        """
+        layout = layout or Config.PDF_TEXT_LAYOUT
+        if layout not in PDFExtractor.LAYOUTS:
+            raise ValueError(f"Modo de extracción no válido: {layout}")
+
+        path = PDFExtractor._validate_pdf(pdf_path)
+        PDFExtractor._check_header(path)
+
+        try:
+            with _fitz().open(path, filetype="pdf") as documento:
+                indices = PDFExtractor._page_indices(pages, len(documento))
+                yield from PDFExtractor._iter_document(documento, layout, indices)
+        finally:
+            _shrink_store()
+
+    @staticmethod
+    def iter_pages_with_blocks(
+        pdf_path: str,
+        pages: Optional[Sequence[int]] = None
+    ) -> Iterator[Tuple[str, list]]:
+        """
+        Recorre un PDF obteniendo de cada página el texto y sus bloques.
+
+        Ambas salidas se derivan del mismo `TextPage`, de modo que MuPDF
+        interpreta el contenido de cada página una sola vez aunque se pidan
+        dos formatos.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+            pages (Optional[Sequence[int]]): Índices de página (desde 0) a
+                recorrer, en el orden indicado. Por defecto, todas.
+
+        Yields:
+            Tuple[str, list]: Texto plano de la página y sus bloques
+                (x0, y0, x1, y1, texto, n.º de bloque, tipo).
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si el archivo no es un PDF válido.
+        """
+        path = PDFExtractor._validate_pdf(pdf_path)
+        PDFExtractor._check_header(path)
+
+        try:
+            with _fitz().open(path, filetype="pdf") as documento:
+                for indice in PDFExtractor._page_indices(pages, len(documento)):
+                    pagina = documento.load_page(indice)
+                    textpage = pagina.get_textpage(flags=_text_flags())
+                    texto = PDFExtractor._page_text(pagina, "fast", textpage)
+                    bloques = pagina.get_text("blocks", textpage=textpage)
+                    # Liberar el TextPage antes de pasar a la siguiente página
+                    del textpage
+                    yield texto, bloques
+        finally:
+            _shrink_store()
+
+    @staticmethod
+    def _iter_document(
+        documento,
+        layout: str,
+        indices: Optional[Sequence[int]] = None
+    ) -> Iterator[str]:
+        """
+        Genera el texto de las páginas de un documento abierto.
+
+        Args:
+            documento (fitz.Document): Documento PDF abierto.
+            layout (str): Modo de extracción por página.
+            indices (Optional[Sequence[int]]): Páginas a recorrer (por
+                defecto, todas). Sólo se cargan las indicadas.
+
+        Yields:
+            str: Texto de cada página, en orden.
+        """
+        if indices is None:
+            indices = range(len(documento))
+
+        total_paginas = len(indices)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for n, indice in enumerate(indices, start=1):
+            if debug:
+                logger.debug("Procesando página %d/%d", n, total_paginas)
+            yield PDFExtractor._page_text(documento.load_page(indice), layout)
+
+    @staticmethod
+    def _page_indices(pages: Optional[Sequence[int]], total_paginas: int) -> Sequence[int]:
+        """
+        Valida los índices de página pedidos frente al tamaño del documento.
+
+        Args:
+            pages (Optional[Sequence[int]]): Índices pedidos, o None para todos.
+            total_paginas (int): Número de páginas del documento.
+
+        Returns:
+            Sequence[int]: Índices a extraer.
+
+        Raises:
+            ValueError: Si algún índice está fuera del documento.
+        """
+        if pages is None:
+            return range(total_paginas)
+
+        fuera = [p for p in pages if not 0 <= p < total_paginas]
+        if fuera:
+            raise ValueError(
+                f"Páginas fuera de rango {fuera}: el documento tiene {total_paginas}"
+            )
+        return pages
+
+    @staticmethod
+    def _validate_pdf(pdf_path: str) -> Path:
+        """
+        Comprueba que la ruta apunta a un archivo no vacío.
+
+        Que sea un PDF se comprueba después por su cabecera (`PDF_MAGIC`),
+        al leer el contenido, y no por la extensión del nombre.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+
+        Returns:
+            Path: Ruta validada.
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe.
+            ValueError: Si el archivo está vacío.
+        """
+        path = Path(pdf_path)
+        if not path.exists():
+            raise FileNotFoundError(f"El archivo no existe: {pdf_path}")
+
+        if path.stat().st_size == 0:
+            raise ValueError(f"El archivo está vacío: {pdf_path}")
+
+        return path
+
+    @staticmethod
+    def _check_header(path: Path):
+        """
+        Comprueba que el archivo empieza por la cabecera de un PDF.
+
+        Args:
+            path (Path): Ruta al archivo.
+
+        Raises:
+            ValueError: Si no aparece `PDF_MAGIC` al inicio del archivo.
+        """
+        with open(path, 'rb') as f:
+            cabecera = f.read(PDFExtractor.MAGIC_SEARCH_BYTES)
+        if PDFExtractor.PDF_MAGIC not in cabecera:
+            raise ValueError(f"El archivo no es un PDF: {path}")
+
+    @staticmethod
+    def _cache_path(
+        datos,
+        layout: str,
+        seleccion: Optional[List[int]] = None
+    ) -> Path:
+        """
+        Calcula el archivo de caché del texto extraído de un PDF.
+
+        Args:
+            datos: Contenido del archivo (bytes o mmap).
+            layout (str): Modo de extracción.
+            seleccion (Optional[List[int]]): Páginas extraídas, ordenadas y
+                sin repetir, o None si son todas.
+
+        Returns:
+            Path: Ruta del archivo de caché en `Config.TEMP_DIR`.
+        """
+        clave = hashlib.blake2b(datos, digest_size=16).hexdigest()
+        if seleccion is not None:
+            rango = ",".join(map(str, seleccion)).encode("ascii")
+            clave += "-" + hashlib.blake2b(rango, digest_size=8).hexdigest()
+        return Config.TEMP_DIR / f"{clave}.{layout}.pages"
+
+    @staticmethod
+    def _write_cache(cache_file: Path, paginas: List[str]):
+        """
+        Guarda el texto extraído en caché de forma atómica.
+
+        Se escribe en un archivo temporal del mismo directorio y después se
+        renombra, para que una lectura concurrente o una interrupción nunca
+        dejen un archivo de caché a medias.
+
+        Args:
+            cache_file (Path): Archivo de caché de destino.
+            paginas (List[str]): Texto de cada página.
+        """
+        tmp_name = None
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                'w',
+                encoding='utf-8',
+                dir=cache_file.parent,
+                suffix='.tmp',
+                delete=False
+            ) as tmp:
+                tmp_name = tmp.name
+                # Página a página sobre el buffer del archivo, sin construir
+                # antes una copia de todo el texto unido
+                for indice, pagina in enumerate(paginas):
+                    if indice:
+                        tmp.write(PDFExtractor.PAGE_SEPARATOR)
+                    tmp.write(pagina)
+            os.replace(tmp_name, cache_file)
+
+        except OSError as e:
+            logger.warning("No se pudo guardar el texto en caché: %s", e)
+            if tmp_name is not None:
+                try:
+                    os.unlink(tmp_name)
+                except OSError:
+                    pass
+
+    @staticmethod
+    def _page_text(pagina, layout: str = "fast", textpage=None) -> str:
+        """
+        Extrae el texto plano de una página.
+
+        Args:
+            pagina (fitz.Page): Página del documento.
+            layout (str): Modo de extracción ("fast", "blocks" o "raw").
+            textpage (Optional[fitz.TextPage]): Análisis de la página ya
+                hecho con `get_textpage`; si se indica, se reutiliza en lugar
+                de volver a interpretar el contenido de la página.
+
+        Returns:
+            str: Texto de la página.
+        """
+        if textpage is not None:
+            opciones = {"textpage": textpage}
+        else:
+            opciones = {"flags": 0 if layout == "raw" else _text_flags()}
+
+        if layout == "blocks":
+            return PDFExtractor._blocks_text(pagina.get_text("blocks", **opciones))
+
+        return pagina.get_text("text", sort=False, **opciones)
+
+    @staticmethod
+    def _blocks_text(bloques: list) -> str:
+        """
+        Une el texto de los bloques de una página en orden de posición.
+
+        Args:
+            bloques (list): Bloques devueltos por `get_text("blocks")`.
+
+        Returns:
+            str: Texto de los bloques de texto, de arriba abajo y de
+                izquierda a derecha.
+        """
+        bloques = sorted(bloques, key=lambda b: (b[1], b[0]))  # y, luego x
+        return "\n".join(b[4] for b in bloques if b[6] == 0)  # sólo texto
+
+    @staticmethod
+    def _extract_pages_parallel(
+        pdf_path: str,
+        indices: Sequence[int],
+        layout: str = "fast",
+        max_workers: Optional[int] = None
+    ) -> List[str]:
+        """
+        Extrae el texto de las páginas repartiéndolas entre procesos.
+
+        PyMuPDF no admite varios hilos, ni siquiera con un documento por
+        hilo, y no libera el GIL, así que se sigue su receta de
+        multiprocesamiento: cada proceso abre el archivo y extrae un tramo
+        contiguo de páginas.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+            indices (Sequence[int]): Índices de las páginas a extraer.
+            layout (str): Modo de extracción por página.
+            max_workers (Optional[int]): Número de procesos (por defecto,
+                `_default_workers`).
+
+        Returns:
+            List[str]: Texto de cada página, en el orden de `indices`.
+        """
+        indices = list(indices)
+        workers = max_workers or PDFExtractor._default_workers(len(indices))
+        tamano = -(-len(indices) // workers)  # división redondeando hacia arriba
+        tramos = [indices[i:i + tamano] for i in range(0, len(indices), tamano)]
+
+        with PDFExtractor._process_pool(len(tramos)) as executor:
+            resultados = executor.map(
+                PDFExtractor._extract_page_range,
+                [pdf_path] * len(tramos),
+                tramos,
+                [layout] * len(tramos)
+            )
+            return [texto for tramo in resultados for texto in tramo]
+
+    @staticmethod
+    def _default_workers(total_paginas: int) -> int:
+        """
+        Calcula cuántos procesos usar para extraer un número de páginas.
+
+        Args:
+            total_paginas (int): Número de páginas a extraer.
+
+        Returns:
+            int: El menor entre `MAX_WORKERS`, las CPUs y los tramos de al
+                menos `MIN_PAGES_PER_WORKER` páginas que caben (mínimo 1).
+        """
+        tramos = max(1, total_paginas // PDFExtractor.MIN_PAGES_PER_WORKER)
+        return min(PDFExtractor.MAX_WORKERS, os.cpu_count() or 1, tramos)
+
+    @staticmethod
+    def _process_pool(max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """
+        Crea un pool de procesos para trabajar con PyMuPDF.
+
+        Usa siempre "spawn": el proceso principal tiene hilos (la interfaz,
+        el cliente HTTP) y un fork podría heredar sus bloqueos tomados.
+
+        Args:
+            max_workers (Optional[int]): Número de procesos (por defecto, CPUs).
+
+        Returns:
+            ProcessPoolExecutor: Pool listo para usar como gestor de contexto.
+        """
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+
+    @staticmethod
+    def _extract_page_range(pdf_path: str, indices: List[int], layout: str) -> List[str]:
+        """
+        Extrae un tramo de páginas en un proceso trabajador.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+            indices (List[int]): Índices de las páginas del tramo.
+            layout (str): Modo de extracción por página.
+
+        Returns:
+            List[str]: Texto de cada página del tramo, en orden.
+        """
+        try:
+            with _fitz().open(pdf_path, filetype="pdf") as documento:
+                return list(PDFExtractor._iter_document(documento, layout, indices))
+        finally:
+            _shrink_store()
+
     @staticmethod
     def get_pdf_info(pdf_path: str) -> dict:
         """
@@ -89,15 +771,69 @@ class PDFExtractor:
             dict: Diccionario con información del PDF.
         """
         try:
-            documento = fitz.open(pdf_path)
-            info = {
-                'num_paginas': len(documento),
-                'metadata': documento.metadata,
-                'tamano_kb': Path(pdf_path).stat().st_size / 1024
-            }
-            documento.close()
-            return info
+            with _fitz().open(pdf_path, filetype="pdf") as documento:
+                return {
+                    'num_paginas': documento.page_count,
+                    'metadata': documento.metadata,
+                    'tamano_kb': Path(pdf_path).stat().st_size / 1024
+                }
+
+        except Exception as e:
+            logger.error("Error al obtener información del PDF: %s", e)
+            return {}
+
+    @staticmethod
+    def get_pdf_size(pdf_path: str) -> Optional[float]:
+        """
+        Obtiene el tamaño del PDF sin abrirlo con PyMuPDF.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+
+        Returns:
+            Optional[float]: Tamaño en KB, o None si hay error.
+        """
+        try:
+            return Path(pdf_path).stat().st_size / 1024
+
+        except OSError as e:
+            logger.error("Error al obtener el tamaño del PDF: %s", e)
+            return None
+
+    @staticmethod
+    def get_pdf_page_count(pdf_path: str) -> Optional[int]:
+        """
+        Obtiene el número de páginas del PDF sin recorrerlas.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+
+        Returns:
+            Optional[int]: Número de páginas, o None si hay error.
+        """
+        try:
+            with _fitz().open(pdf_path, filetype="pdf") as documento:
+                return documento.page_count
+
+        except Exception as e:
+            logger.error("Error al obtener el número de páginas del PDF: %s", e)
+            return None
+
+    @staticmethod
+    def get_pdf_metadata(pdf_path: str) -> dict:
+        """
+        Obtiene los metadatos del PDF (título, autor, etc.) sin leer páginas.
+
+        Args:
+            pdf_path (str): Ruta al archivo PDF.
+
+        Returns:
+            dict: Metadatos del documento, o un diccionario vacío si hay error.
+        """
+        try:
+            with _fitz().open(pdf_path, filetype="pdf") as documento:
+                return documento.metadata or {}
 
         except Exception as e:
-            logger.error(f"Error al obtener información del PDF: {e}")
+            logger.error("Error al obtener los metadatos del PDF: %s", e)
             return {}
@@ -0,0 +1,169 @@
+"""
+Limitador de peticiones para la API de OpenAI.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncLimiter:
+    """
+    Limitador con dos cubos de tokens: peticiones por minuto y tokens por minuto.
+
+    Los cubos se rellenan de forma continua según un reloj monótono y se
+    reajustan con las cabeceras `x-ratelimit-remaining-*` de cada respuesta,
+    descontando lo reservado por las peticiones aún en curso. No usa
+    primitivas de asyncio ligadas a un bucle, por lo que la misma instancia
+    puede reutilizarse entre ejecuciones.
+
+    Los límites de OpenAI son por modelo: usar un limitador por modelo (ver
+    `ModelRateLimiter`).
+    """
+
+    def __init__(self, max_rpm: int, max_tpm: int):
+        """
+        Inicializa el limitador.
+
+        Args:
+            max_rpm (int): Máximo de peticiones por minuto.
+            max_tpm (int): Máximo de tokens por minuto.
+        """
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        self._req_tokens = float(max_rpm)
+        self._tok_tokens = float(max_tpm)
+        self._last = time.monotonic()
+        # Reservas de peticiones enviadas cuya respuesta aún no ha llegado
+        self._in_flight_requests = 0
+        self._in_flight_tokens = 0
+
+    def _refill(self):
+        """Rellena los cubos según el tiempo transcurrido."""
+        now = time.monotonic()
+        elapsed = now - self._last
+        self._last = now
+        self._req_tokens = min(self.max_rpm, self._req_tokens + elapsed * self.max_rpm / 60)
+        self._tok_tokens = min(self.max_tpm, self._tok_tokens + elapsed * self.max_tpm / 60)
+
+    async def acquire(self, expected_tokens: int = 0):
+        """
+        Espera hasta que haya capacidad para una petición y la reserva.
+
+        La reserva sigue en curso hasta llamar a `release`.
+
+        Args:
+            expected_tokens (int): Tokens estimados de la petición (prompt más
+                respuesta máxima). Se limita a `max_tpm` para que una petición
+                grande no espere indefinidamente.
+        """
+        expected = min(expected_tokens, self.max_tpm)
+
+        while True:
+            self._refill()
+            if self._req_tokens >= 1 and self._tok_tokens >= expected:
+                self._req_tokens -= 1
+                self._tok_tokens -= expected
+                self._in_flight_requests += 1
+                self._in_flight_tokens += expected
+                return
+
+            espera = max(
+                (1 - self._req_tokens) * 60 / self.max_rpm,
+                (expected - self._tok_tokens) * 60 / self.max_tpm,
+                0.01
+            )
+            logger.debug("Límite de tasa alcanzado, esperando %.2f s", espera)
+            await asyncio.sleep(espera)
+
+    def release(self, expected_tokens: int = 0):
+        """
+        Da por terminada una reserva hecha con `acquire`.
+
+        Debe llamarse cuando llega la respuesta (o falla la petición), antes
+        de `update_from_headers`.
+
+        Args:
+            expected_tokens (int): Tokens indicados al reservar.
+        """
+        expected = min(expected_tokens, self.max_tpm)
+        self._in_flight_requests = max(0, self._in_flight_requests - 1)
+        self._in_flight_tokens = max(0, self._in_flight_tokens - expected)
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """
+        Ajusta los cubos con la capacidad restante informada por la API.
+
+        La API aún no ha contado las peticiones que siguen en curso, así que
+        sus reservas se descuentan de la capacidad restante.
+
+        Args:
+            headers (Mapping[str, str]): Cabeceras de la respuesta HTTP.
+        """
+        remaining_requests = self._parse_header(headers, "x-ratelimit-remaining-requests")
+        remaining_tokens = self._parse_header(headers, "x-ratelimit-remaining-tokens")
+
+        self._refill()
+        if remaining_requests is not None:
+            self._req_tokens = min(
+                self.max_rpm, remaining_requests - self._in_flight_requests
+            )
+        if remaining_tokens is not None:
+            self._tok_tokens = min(
+                self.max_tpm, remaining_tokens - self._in_flight_tokens
+            )
+
+    @staticmethod
+    def _parse_header(headers: Mapping[str, str], name: str) -> Optional[float]:
+        """Obtiene el valor numérico de una cabecera, o None si no es válido."""
+        value = headers.get(name)
+        if value is None:
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+
+class ModelRateLimiter:
+    """
+    Limitadores independientes por modelo.
+
+    OpenAI aplica y publica en las cabeceras los límites de cada modelo por
+    separado, así que los pasos que usan modelos distintos no deben compartir
+    cubos.
+    """
+
+    def __init__(self, max_rpm: int, max_tpm: int):
+        """
+        Inicializa los limitadores.
+
+        Args:
+            max_rpm (int): Máximo de peticiones por minuto de cada modelo.
+            max_tpm (int): Máximo de tokens por minuto de cada modelo.
+        """
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        self._limiters: Dict[str, AsyncLimiter] = {}
+        self._lock = threading.Lock()
+
+    def get(self, model: str) -> AsyncLimiter:
+        """
+        Obtiene el limitador de un modelo, creándolo la primera vez.
+
+        Args:
+            model (str): Nombre del modelo.
+
+        Returns:
+            AsyncLimiter: Limitador del modelo.
+        """
+        with self._lock:
+            limiter = self._limiters.get(model)
+            if limiter is None:
+                limiter = AsyncLimiter(self.max_rpm, self.max_tpm)
+                self._limiters[model] = limiter
+            return limiter
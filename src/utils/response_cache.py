@@ -0,0 +1,227 @@
+"""
+Caché persistente de respuestas del modelo.
+
+Combina una capa exacta (SQLite, clave por hash del texto) con una capa
+semántica opcional (FAISS) que reutiliza las respuestas de artículos casi
+idénticos.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from contextlib import closing
+from pathlib import Path
+from typing import List, Optional
+
+try:
+    import faiss
+    import numpy as np
+except ImportError:
+    faiss = None
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Caché de respuestas indexada por (modelo, paso, texto)."""
+
+    DB_NAME = "respuestas.sqlite3"
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        similarity_threshold: float = 0.95,
+        semantic: bool = True
+    ):
+        """
+        Inicializa la caché.
+
+        Args:
+            cache_dir (Path): Directorio donde se guarda la base de datos.
+            similarity_threshold (float): Similitud coseno mínima para
+                reutilizar las respuestas de otro artículo.
+            semantic (bool): Activa la capa semántica (requiere faiss y numpy).
+        """
+        cache_dir = Path(cache_dir)
+        cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.db_path = cache_dir / self.DB_NAME
+        self.similarity_threshold = similarity_threshold
+        self.semantic_enabled = semantic and faiss is not None
+
+        if semantic and faiss is None:
+            logger.warning("faiss/numpy no disponibles: caché semántica desactivada")
+
+        # Índice FAISS en memoria, reconstruido desde SQLite bajo demanda
+        self._lock = threading.Lock()
+        self._index = None
+        self._index_hashes: List[str] = []
+
+        with self._connect() as conn, conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS articulos "
+                "(text_hash TEXT PRIMARY KEY, embedding BLOB)"
+            )
+
+    def _connect(self):
+        """Abre una conexión nueva que se cierra al salir del bloque `with`."""
+        return closing(sqlite3.connect(self.db_path))
+
+    @staticmethod
+    def text_hash(texto: str) -> str:
+        """
+        Calcula el hash identificador de un texto.
+
+        Args:
+            texto (str): Texto del artículo.
+
+        Returns:
+            str: Hash SHA-256 en hexadecimal.
+        """
+        return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def make_key(model: str, step_name: str, text_hash: str) -> str:
+        """
+        Construye la clave de caché de un paso.
+
+        Args:
+            model (str): Modelo utilizado.
+            step_name (str): Nombre del paso de análisis.
+            text_hash (str): Hash del texto del artículo.
+
+        Returns:
+            str: Clave de caché.
+        """
+        return hashlib.sha256(f"{model}|{step_name}|{text_hash}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Obtiene una respuesta de la caché.
+
+        Args:
+            key (str): Clave de caché.
+
+        Returns:
+            Optional[str]: Respuesta almacenada, o None si no existe.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response FROM cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, response: str):
+        """
+        Guarda una respuesta en la caché.
+
+        Args:
+            key (str): Clave de caché.
+            response (str): Respuesta a almacenar.
+        """
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response) VALUES (?, ?)",
+                (key, response)
+            )
+
+    def has_article(self, text_hash: str) -> bool:
+        """Indica si el artículo ya está registrado en la capa semántica."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM articulos WHERE text_hash = ?", (text_hash,)
+            ).fetchone()
+        return row is not None
+
+    def add_article(self, text_hash: str, embedding: List[float]):
+        """
+        Registra el embedding de un artículo en la capa semántica.
+
+        Args:
+            text_hash (str): Hash del texto del artículo.
+            embedding (List[float]): Embedding del texto.
+        """
+        if not self.semantic_enabled:
+            return
+
+        vector = self._normalize(embedding)
+        with self._connect() as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO articulos (text_hash, embedding) VALUES (?, ?)",
+                (text_hash, vector.tobytes())
+            )
+
+        with self._lock:
+            if self._index is not None and text_hash not in self._index_hashes:
+                self._index.add(vector.reshape(1, -1))
+                self._index_hashes.append(text_hash)
+
+    def find_similar(self, embedding: List[float]) -> Optional[str]:
+        """
+        Busca el artículo más parecido ya registrado.
+
+        Args:
+            embedding (List[float]): Embedding del texto a buscar.
+
+        Returns:
+            Optional[str]: Hash del artículo cuya similitud supera el umbral,
+                o None si no hay ninguno.
+        """
+        if not self.semantic_enabled:
+            return None
+
+        vector = self._normalize(embedding)
+        with self._lock:
+            self._ensure_index(vector.shape[0])
+            if self._index.ntotal == 0:
+                return None
+            scores, ids = self._index.search(vector.reshape(1, -1), 1)
+
+        score, idx = float(scores[0][0]), int(ids[0][0])
+        if idx < 0 or score < self.similarity_threshold:
+            return None
+
+        logger.info("Artículo similar encontrado en caché (similitud %.3f)", score)
+        return self._index_hashes[idx]
+
+    def clear(self):
+        """Vacía la caché por completo."""
+        with self._connect() as conn, conn:
+            conn.execute("DELETE FROM cache")
+            conn.execute("DELETE FROM articulos")
+
+        with self._lock:
+            self._index = None
+            self._index_hashes = []
+
+        logger.info("Caché de respuestas vaciada")
+
+    def _ensure_index(self, dim: int):
+        """Construye el índice FAISS desde SQLite si aún no existe."""
+        if self._index is not None:
+            return
+
+        self._index = faiss.IndexFlatIP(dim)
+        self._index_hashes = []
+
+        with self._connect() as conn:
+            rows = conn.execute("SELECT text_hash, embedding FROM articulos").fetchall()
+
+        for text_hash, blob in rows:
+            vector = np.frombuffer(blob, dtype=np.float32)
+            if vector.shape[0] != dim:
+                continue
+            self._index.add(vector.reshape(1, -1))
+            self._index_hashes.append(text_hash)
+
+    @staticmethod
+    def _normalize(embedding: List[float]):
+        """Normaliza el embedding para que el producto interno sea el coseno."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector